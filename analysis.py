@@ -1,4 +1,4 @@
-from datetime import date, timedelta
+from datetime import date
 from typing import Tuple
 from habit import Habit
 
@@ -43,16 +43,17 @@ def get_broken_habits(habit: Habit, days_range: int) -> Tuple[int, int]:
     """
     now = date.today()
     all_days = now - habit.creation_date
-    periodicity = {'daily': 1, 'weekly': 7, 'monthly': 30}
+    table = habit.period_table
+    progress = set(habit.progress)
 
-    periods_elapsed = all_days.days // periodicity[habit.periodicity]
-    periods_wanted = days_range // periodicity[habit.periodicity]
+    periods_elapsed = table.period_index(now)
+    periods_wanted = table.periods_in_range(now, days_range)
 
     if all_days.days < days_range:
         ideal = list(range(0, periods_elapsed))
         fails = 0
         for i in ideal:
-            if i not in habit.progress:
+            if i not in progress:
                 fails += 1
         completeness = periods_elapsed - fails
         return completeness, periods_elapsed
@@ -61,7 +62,7 @@ def get_broken_habits(habit: Habit, days_range: int) -> Tuple[int, int]:
     ideal = list(range(periods_to_skip, periods_elapsed))
     fails = 0
     for i in ideal:
-        if i not in habit.progress:
+        if i not in progress:
             fails += 1
 
     completeness = periods_wanted - fails
@@ -79,11 +80,4 @@ def get_days_left(habit: Habit) -> int:
     Returns:
         int: The number of days left to complete the habit.
     """
-    now = date.today()
-    periodicity = {'daily': 1, 'weekly': 7, 'monthly': 30}
-    current_period = (now - habit.creation_date).days // periodicity[habit.periodicity]
-
-    next_period_start = habit.creation_date + timedelta(days=(current_period + 1) * periodicity[habit.periodicity])
-    days_left = (next_period_start - now).days
-
-    return days_left
+    return habit.period_table.days_left(date.today())
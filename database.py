@@ -1,12 +1,43 @@
+import copy
+import itertools
 import json
+import threading
+from contextlib import nullcontext
 from pathlib import Path
 from habit import Habit
 DEFAULT_PATH = Path(__file__).parent / 'database.json'
 
 
 class Database:
-    def __init__(self):
+    def __init__(self, thread_safe: bool = False):
+        """
+        Initialize a Database object.
+
+        Args:
+            thread_safe (bool): Whether to guard the database with a structure lock and one lock per habit.
+        """
         self.habits = {}
+        self.thread_safe: bool = thread_safe
+        self.structure_lock = threading.Lock() if thread_safe else nullcontext()
+        self.locks: dict = {}
+        self.changes: int = 0
+        self._change_counter = itertools.count(1)
+
+    def _new_lock(self):
+        return threading.Lock() if self.thread_safe else nullcontext()
+
+    def _changed(self) -> None:
+        # next() on itertools.count is atomic in CPython, so no lock is needed. Every change
+        # gets a distinct number, so a change is never mistaken for an earlier state.
+        self.changes = next(self._change_counter)
+
+    def _habit_lock(self, name: str):
+        # Habits may be put into self.habits directly, so their locks are created on first use.
+        # Must be called while holding the structure lock.
+        lock = self.locks.get(name)
+        if lock is None:
+            lock = self.locks[name] = self._new_lock()
+        return lock
 
     def add_habit(self, habit: Habit) -> None:
         """
@@ -18,9 +49,12 @@ class Database:
         Raises:
             RuntimeError: If the habit with the same name already exists in the database.
         """
-        if self.habits.get(habit.name):
-            raise RuntimeError()
-        self.habits[habit.name] = habit
+        with self.structure_lock:
+            if self.habits.get(habit.name):
+                raise RuntimeError()
+            self.habits[habit.name] = habit
+            self.locks[habit.name] = self._new_lock()
+            self._changed()
 
     def delete_habit(self, delete_habit: str):
         """
@@ -32,7 +66,48 @@ class Database:
         Raises:
             KeyError: If the habit is not found in the database.
         """
-        del self.habits[delete_habit]
+        with self.structure_lock:
+            del self.habits[delete_habit]
+            self.locks.pop(delete_habit, None)
+            self._changed()
+
+    def complete_habit(self, name: str) -> None:
+        """
+        Mark a habit in the database as completed for the current period.
+
+        Args:
+            name (str): The name of the habit to complete.
+
+        Raises:
+            KeyError: If the habit is not found in the database.
+            RuntimeError: If the habit is already completed for the current period.
+        """
+        with self.structure_lock:
+            habit = self.habits[name]
+            lock = self._habit_lock(name)
+        with lock:
+            habit.complete()
+            self._changed()
+
+    def snapshot(self) -> dict:
+        """
+        Get a consistent copy of the habits in the database.
+
+        Each habit is copied while holding its lock, so readers can iterate over
+        the snapshot while other threads keep changing the database.
+
+        Returns:
+            dict: A dictionary of habit names to copies of the habits.
+        """
+        with self.structure_lock:
+            items = [(name, habit, self._habit_lock(name)) for name, habit in self.habits.items()]
+        habits = {}
+        for name, habit, lock in items:
+            with lock:
+                habit_copy = copy.copy(habit)
+                habit_copy.progress = list(habit.progress)
+            habits[name] = habit_copy
+        return habits
 
     def save_habits(self, path: Path = DEFAULT_PATH):
         """
@@ -42,7 +117,7 @@ class Database:
             path (Path): The path to the JSON file.
         """
         habits_json = {}
-        for key, val in self.habits.items():
+        for key, val in self.snapshot().items():
             habits_json[key] = val.to_dictionary()
         with open(path, 'w') as f:
             json.dump(habits_json, f)
@@ -56,6 +131,9 @@ class Database:
         """
         with open(path, 'r') as f:
             habits_json = json.load(f)
-        self.habits = {}
+        habits = {}
         for key, val in habits_json.items():
-            self.habits[key] = Habit.from_dictionary(val)
+            habits[key] = Habit.from_dictionary(val)
+        with self.structure_lock:
+            self.habits = habits
+            self.locks = {key: self._new_lock() for key in habits}
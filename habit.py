@@ -1,4 +1,5 @@
 from datetime import date
+from periodicity import PeriodTable, get_period_table
 
 
 class Habit:
@@ -8,7 +9,7 @@ class Habit:
 
         Args:
             name (str): The name of the habit.
-            periodicity (str): The periodicity of the habit (daily, weekly, or monthly).
+            periodicity (str): The periodicity of the habit (daily, weekly, monthly, calendar monthly or every N days).
         """
         self.name: str = name
         self.periodicity: str = periodicity
@@ -22,13 +23,21 @@ class Habit:
         Raises:
             RuntimeError: If the habit is already completed for the current period.
         """
-        now = date.today()
-        periodicity = {'daily': 1, 'weekly': 7, 'monthly': 30}
-        current_period = (now - self.creation_date) // periodicity[self.periodicity]
+        current_period = self.period_table.period_index(date.today())
 
-        if current_period.days in self.progress:
+        if current_period in self.progress:
             raise RuntimeError('habit already completed.')
-        self.progress.append(current_period.days)
+        self.progress.append(current_period)
+
+    @property
+    def period_table(self) -> PeriodTable:
+        """
+        Get the period table of the habit.
+
+        Returns:
+            PeriodTable: The shared table for the creation date and periodicity of the habit.
+        """
+        return get_period_table(self.creation_date, self.periodicity)
 
     def to_dictionary(self):
         """
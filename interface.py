@@ -3,6 +3,7 @@ from analysis import get_longest_streak, get_broken_habits, get_days_left
 from tabulate import tabulate
 from database import Database
 from datetime import date
+from periodicity import is_valid_periodicity
 
 
 def create_habit(database: Database) -> None:
@@ -13,9 +14,8 @@ def create_habit(database: Database) -> None:
         database (Database): The database containing habits.
     """
     name = input("Enter habit name: ")
-    keys = ['daily', 'weekly', 'monthly']
-    periodicity = input("Choose periodicity (daily, weekly or monthly): ")
-    if periodicity not in keys:
+    periodicity = input("Choose periodicity (daily, weekly, monthly, calendar monthly or every N days): ")
+    if not is_valid_periodicity(periodicity):
         print('wrong periodicity')
         return
     habit = Habit(name, periodicity)
@@ -45,19 +45,18 @@ def view_habits(database: Database):
     Args:
         database (Database): The database containing habits.
     """
-    keys = ['daily', 'weekly', 'monthly', '']
     periodicity = input("Enter periodicity (leave blank for all habits): ")
-    if periodicity not in keys:
+    if periodicity != "" and not is_valid_periodicity(periodicity):
         print('wrong periodicity')
         return
     elif periodicity == "":
         table = []
-        for habit in database.habits.values():
+        for habit in database.snapshot().values():
             table.append([habit.name, habit.periodicity])
         print(tabulate(table, headers=["Name", "Periodicity"]))
     else:
         table = []
-        for habit in database.habits.values():
+        for habit in database.snapshot().values():
             if periodicity == habit.periodicity:
                 table.append([habit.name, habit.periodicity])
         if not table:
@@ -76,7 +75,7 @@ def complete_habit(database: Database):
     name = input("Enter habit name to complete: ")
     try:
         try:
-            database.habits[name].complete()
+            database.complete_habit(name)
         except KeyError:
             print(f"Habit {name} non exiting.")
             return
@@ -96,7 +95,7 @@ def view_longest_streak(database: Database):
     if name == "":
         streaks = []
         names = []
-        for habit in database.habits.values():
+        for habit in database.snapshot().values():
             streak = get_longest_streak(habit)
             streaks.append(streak)
             names.append(habit.name)
@@ -104,7 +103,7 @@ def view_longest_streak(database: Database):
         print(f"Longest streak of all habits: {streaks[longest]} for habit {names[longest]}")
     else:
         try:
-            streak = get_longest_streak(database.habits[name])
+            streak = get_longest_streak(database.snapshot()[name])
             print(f"Longest streak of {name}: {streak}")
         except KeyError:
             print(f"Habit {name} not found.")
@@ -119,7 +118,7 @@ def view_broken_habits(database: Database):
     """
     days_range = int(input("Enter days range: "))
     table = []
-    for habit in database.habits.values():
+    for habit in database.snapshot().values():
         completeness, periods_wanted = get_broken_habits(habit, days_range)
         try:
             percentage = (completeness / periods_wanted) * 100
@@ -140,13 +139,12 @@ def view_days_left_table(database: Database):
         database (Database): The database containing habits.
     """
     now = date.today()
-    periodicity = {'daily': 1, 'weekly': 7, 'monthly': 30}
 
     table = []
-    for habit in database.habits.values():
+    for habit in database.snapshot().values():
         days_left = get_days_left(habit)
 
-        current_period = (now - habit.creation_date).days // periodicity[habit.periodicity]
+        current_period = habit.period_table.period_index(now)
         if current_period in habit.progress:
             continue
 
@@ -0,0 +1,199 @@
+import re
+import threading
+from array import array
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+FIXED_PERIODICITIES = {'daily': 1, 'weekly': 7, 'monthly': 30}
+CALENDAR_MONTHLY = 'calendar monthly'
+CUSTOM_PATTERN = re.compile(r'^every (\d+) days$')
+
+
+def period_length(periodicity: str) -> Optional[int]:
+    """
+    Get the fixed number of days in one period of a periodicity.
+
+    Args:
+        periodicity (str): The periodicity (daily, weekly, monthly, calendar monthly or every N days).
+
+    Returns:
+        Optional[int]: The number of days in a period, or None for calendar months.
+
+    Raises:
+        ValueError: If the periodicity is not recognised.
+    """
+    if periodicity in FIXED_PERIODICITIES:
+        return FIXED_PERIODICITIES[periodicity]
+    if periodicity == CALENDAR_MONTHLY:
+        return None
+    match = CUSTOM_PATTERN.match(periodicity)
+    if match and int(match.group(1)) > 0:
+        return int(match.group(1))
+    raise ValueError(f'unknown periodicity: {periodicity}')
+
+
+def is_valid_periodicity(periodicity: str) -> bool:
+    """
+    Check whether a periodicity is recognised.
+
+    Args:
+        periodicity (str): The periodicity to check.
+
+    Returns:
+        bool: True if the periodicity is recognised.
+    """
+    try:
+        period_length(periodicity)
+    except ValueError:
+        return False
+    return True
+
+
+def _next_month_start(ordinal: int) -> int:
+    day = date.fromordinal(ordinal)
+    if day.month == 12:
+        return date(day.year + 1, 1, 1).toordinal()
+    return date(day.year, day.month + 1, 1).toordinal()
+
+
+class PeriodTable:
+    def __init__(self, origin: date, periodicity: str):
+        """
+        Initialize a PeriodTable holding the period start days of a habit.
+
+        Args:
+            origin (date): The first day of period 0, usually the habit creation date.
+            periodicity (str): The periodicity of the habit.
+        """
+        self.origin: date = origin
+        self.periodicity: str = periodicity
+        self.step: Optional[int] = period_length(periodicity)
+        self.starts: array = array('l', [origin.toordinal()])
+        self.lock = threading.Lock()
+
+    def _extend(self, ordinal: int) -> None:
+        """
+        Extend the table until it contains the period covering a day ordinal.
+
+        Args:
+            ordinal (int): The day ordinal that has to be covered.
+        """
+        if self.starts[-1] > ordinal:
+            return
+        with self.lock:
+            last = self.starts[-1]
+            while last <= ordinal:
+                last = last + self.step if self.step else _next_month_start(last)
+                self.starts.append(last)
+
+    def period_index(self, day: date) -> int:
+        """
+        Get the index of the period a day falls in.
+
+        Args:
+            day (date): The day to look up.
+
+        Returns:
+            int: The index of the period, starting at 0 for the origin.
+
+        Raises:
+            ValueError: If the day is before the origin of the table.
+        """
+        ordinal = day.toordinal()
+        if ordinal < self.starts[0]:
+            raise ValueError(f'{day} is before {self.origin}')
+        self._extend(ordinal)
+        return bisect_right(self.starts, ordinal) - 1
+
+    def period_indices(self, days: Iterable[date]) -> List[int]:
+        """
+        Get the period indices of many days at once.
+
+        Args:
+            days (Iterable[date]): The days to look up.
+
+        Returns:
+            List[int]: The period index of each day, in the same order.
+
+        Raises:
+            ValueError: If any day is before the origin of the table.
+        """
+        ordinals = [day.toordinal() for day in days]
+        if not ordinals:
+            return []
+        if min(ordinals) < self.starts[0]:
+            raise ValueError(f'days before {self.origin} are not covered')
+        self._extend(max(ordinals))
+        starts = self.starts
+        return [bisect_right(starts, ordinal) - 1 for ordinal in ordinals]
+
+    def period_start(self, index: int) -> date:
+        """
+        Get the first day of a period.
+
+        Args:
+            index (int): The index of the period.
+
+        Returns:
+            date: The first day of the period.
+        """
+        while len(self.starts) <= index:
+            self._extend(self.starts[-1])
+        return date.fromordinal(self.starts[index])
+
+    def period_end(self, index: int) -> date:
+        """
+        Get the first day after a period, which is the start of the next one.
+
+        Args:
+            index (int): The index of the period.
+
+        Returns:
+            date: The first day of the following period.
+        """
+        return self.period_start(index + 1)
+
+    def days_left(self, day: date) -> int:
+        """
+        Calculate the number of days from a day until the end of its period.
+
+        Args:
+            day (date): The day to count from.
+
+        Returns:
+            int: The number of days left in the period, including the day itself.
+        """
+        return (self.period_end(self.period_index(day)) - day).days
+
+    def periods_in_range(self, day: date, days_range: int) -> int:
+        """
+        Calculate how many periods fit into a range of days ending on a day.
+
+        Args:
+            day (date): The last day of the range.
+            days_range (int): The number of days in the range.
+
+        Returns:
+            int: The number of periods in the range.
+        """
+        if self.step:
+            return days_range // self.step
+        start = max(day.toordinal() - days_range, self.starts[0])
+        return self.period_index(day) - self.period_index(date.fromordinal(start))
+
+
+@lru_cache(maxsize=1024)
+def get_period_table(origin: date, periodicity: str) -> PeriodTable:
+    """
+    Get the shared period table for an origin and periodicity.
+
+    Args:
+        origin (date): The first day of period 0.
+        periodicity (str): The periodicity of the habit.
+
+    Returns:
+        PeriodTable: The cached period table.
+    """
+    return PeriodTable(origin, periodicity)
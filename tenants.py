@@ -0,0 +1,277 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from database import Database
+
+DEFAULT_ROOT = Path(__file__).parent / 'tenants'
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+USER_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def estimate_size(database: Database) -> int:
+    """
+    Estimate the memory used by the habits of a database.
+
+    Args:
+        database (Database): The database to measure.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    with database.structure_lock:
+        size = sys.getsizeof(database.habits)
+        habits = list(database.habits.items())
+    for name, habit in habits:
+        size += sys.getsizeof(name) + sys.getsizeof(habit) + sys.getsizeof(habit.__dict__)
+        size += sys.getsizeof(habit.periodicity) + sys.getsizeof(habit.creation_date)
+        size += sys.getsizeof(habit.progress) + 28 * len(habit.progress)
+    return size
+
+
+class TenantManager:
+    def __init__(self, root: Path = DEFAULT_ROOT, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """
+        Initialize a TenantManager keeping one database per user in a directory.
+
+        Args:
+            root (Path): The directory holding one JSON file per user.
+            memory_budget (int): The approximate number of bytes loaded databases may use.
+        """
+        self.root: Path = root
+        self.memory_budget: int = memory_budget
+        self.lock = threading.RLock()
+        self.tenants: OrderedDict = OrderedDict()
+        self.sizes: dict = {}
+        self.measured: dict = {}
+        self.saved: dict = {}
+        self.pins: dict = {}
+        self.hits: dict = {}
+        self.memory: int = 0
+        self.total_hits: int = 0
+        self.loads: int = 0
+        self.evictions: int = 0
+
+    def path(self, user_id: str) -> Path:
+        """
+        Get the path to the JSON file of a user.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            Path: The path to the JSON file.
+
+        Raises:
+            ValueError: If the user ID contains characters other than letters, digits, '_' or '-'.
+        """
+        if not USER_ID_PATTERN.match(user_id):
+            raise ValueError(f'invalid user id: {user_id}')
+        return self.root / f'{user_id}.json'
+
+    def get(self, user_id: str) -> Database:
+        """
+        Get the database of a user, loading it if it is not in memory.
+
+        The database may be evicted by later calls, so it should be fetched again
+        instead of being kept around. Use pinned to keep it loaded while changing it.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            Database: The database of the user.
+        """
+        path = self.path(user_id)
+        with self.lock:
+            if self.tenants:
+                self._measure(next(reversed(self.tenants)), changed_only=True)
+            if user_id in self.tenants:
+                self.tenants.move_to_end(user_id)
+                self.hits[user_id] += 1
+                self.total_hits += 1
+                return self.tenants[user_id]
+            database = Database(thread_safe=True)
+            if path.exists():
+                database.load_habits(path)
+            self.loads += 1
+            self.tenants[user_id] = database
+            self.sizes[user_id] = 0
+            self.hits[user_id] = 0
+            self._measure(user_id)
+            self.saved[user_id] = (database.changes, self.sizes[user_id])
+            self.evict()
+            return database
+
+    @contextmanager
+    def pinned(self, user_id: str):
+        """
+        Get the database of a user and keep it from being evicted until the block ends.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Yields:
+            Database: The database of the user.
+        """
+        with self.lock:
+            database = self.get(user_id)
+            self.pins[user_id] = self.pins.get(user_id, 0) + 1
+        try:
+            yield database
+        finally:
+            with self.lock:
+                self.pins[user_id] -= 1
+                if not self.pins[user_id]:
+                    del self.pins[user_id]
+                if user_id in self.tenants:
+                    self._measure(user_id)
+                self.evict()
+
+    def _measure(self, user_id: str, changed_only: bool = False) -> None:
+        database = self.tenants[user_id]
+        changes = database.changes
+        if changed_only and self.measured[user_id] == changes:
+            return
+        self.measured[user_id] = changes
+        size = estimate_size(database)
+        self.memory += size - self.sizes[user_id]
+        self.sizes[user_id] = size
+
+    def touch(self, user_id: str) -> None:
+        """
+        Update the size estimate of a loaded user after its database was changed.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Raises:
+            KeyError: If the user is not loaded.
+        """
+        with self.lock:
+            self._measure(user_id)
+            self.evict()
+
+    def is_dirty(self, user_id: str) -> bool:
+        """
+        Check whether a loaded user was changed since it was loaded or saved.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            bool: True if the database of the user has unsaved changes.
+
+        Raises:
+            KeyError: If the user is not loaded.
+        """
+        with self.lock:
+            self._measure(user_id)
+            return self.saved[user_id] != (self.tenants[user_id].changes, self.sizes[user_id])
+
+    def flush(self, user_id: str) -> None:
+        """
+        Save the database of a loaded user to its file.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Raises:
+            KeyError: If the user is not loaded.
+        """
+        with self.lock:
+            database = self.tenants[user_id]
+            # Read the state before saving, so changes made while saving keep the user dirty.
+            self._measure(user_id)
+            saved = (database.changes, self.sizes[user_id])
+            self.root.mkdir(parents=True, exist_ok=True)
+            database.save_habits(self.path(user_id))
+            self.saved[user_id] = saved
+
+    def flush_all(self) -> None:
+        """
+        Save the databases of all loaded users that have unsaved changes.
+        """
+        with self.lock:
+            for user_id in self.tenants:
+                if self.is_dirty(user_id):
+                    self.flush(user_id)
+
+    def unload(self, user_id: str) -> None:
+        """
+        Save the database of a user if it has unsaved changes and remove it from memory.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Raises:
+            KeyError: If the user is not loaded.
+            RuntimeError: If the user is pinned.
+        """
+        with self.lock:
+            if user_id in self.pins:
+                raise RuntimeError(f'user {user_id} is pinned.')
+            if self.is_dirty(user_id):
+                self.flush(user_id)
+            self.memory -= self.sizes.pop(user_id)
+            del self.tenants[user_id]
+            del self.saved[user_id]
+            del self.measured[user_id]
+            del self.hits[user_id]
+
+    def evict(self) -> None:
+        """
+        Unload the least recently used users until the memory budget is met.
+
+        The most recently used user and pinned users are never evicted.
+        """
+        with self.lock:
+            while self.memory > self.memory_budget:
+                user_id = next((key for key in self.tenants if key not in self.pins), None)
+                if user_id is None or user_id == next(reversed(self.tenants)):
+                    break
+                self.unload(user_id)
+                self.evictions += 1
+
+    def memory_usage(self) -> int:
+        """
+        Get the estimated memory used by all loaded databases.
+
+        Returns:
+            int: The approximate size in bytes.
+        """
+        with self.lock:
+            if self.tenants:
+                self._measure(next(reversed(self.tenants)), changed_only=True)
+            return self.memory
+
+    def tenant_stats(self, user_id: str) -> dict:
+        """
+        Get statistics of a loaded user.
+
+        Args:
+            user_id (str): The ID of the user.
+
+        Returns:
+            dict: The number of habits, estimated size in bytes and cache hits of the user.
+
+        Raises:
+            KeyError: If the user is not loaded.
+        """
+        with self.lock:
+            self._measure(user_id)
+            return {'habits': len(self.tenants[user_id].habits), 'size': self.sizes[user_id],
+                    'hits': self.hits[user_id]}
+
+    def stats(self) -> dict:
+        """
+        Get aggregate statistics of the manager.
+
+        Returns:
+            dict: The number of loaded users, memory usage, budget, hits, loads and evictions.
+        """
+        with self.lock:
+            return {'tenants': len(self.tenants), 'memory': self.memory_usage(), 'budget': self.memory_budget,
+                    'hits': self.total_hits, 'loads': self.loads, 'evictions': self.evictions}
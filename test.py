@@ -1,4 +1,7 @@
 import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, date
 from pathlib import Path
 
@@ -8,6 +11,8 @@ from freezegun import freeze_time
 from analysis import get_longest_streak, get_broken_habits, get_days_left
 from database import Database
 from habit import Habit
+from periodicity import PeriodTable, is_valid_periodicity
+from tenants import TenantManager, estimate_size
 
 CURRENT_DAY = date(2023, 8, 19) + timedelta(28)  # 4 weeks after creation date
 
@@ -306,3 +311,329 @@ def test_days_left(weekly_broken, monthly_empty, daily):
     assert res_1 == exp_1
     assert res_2 == exp_2
     assert res_3 == exp_3
+
+
+def test_period_table_calendar_monthly():
+    """
+    Test looking up periods and boundaries of calendar months.
+    """
+    table = PeriodTable(date(2023, 8, 19), 'calendar monthly')
+    assert table.period_index(date(2023, 8, 31)) == 0
+    assert table.period_index(date(2023, 9, 1)) == 1
+    assert table.period_index(date(2024, 2, 29)) == 6
+    assert table.period_start(2) == date(2023, 10, 1)
+    assert table.period_end(0) == date(2023, 9, 1)
+    assert table.days_left(date(2023, 9, 16)) == 15
+    with pytest.raises(ValueError):
+        table.period_index(date(2023, 8, 18))
+
+
+def test_period_table_custom_days():
+    """
+    Test batched period lookups of a habit repeated every N days.
+    """
+    table = PeriodTable(date(2023, 8, 19), 'every 3 days')
+    days = [date(2023, 8, 19) + timedelta(i) for i in (7, 0, 2, 3, 30)]
+    assert table.period_indices(days) == [2, 0, 0, 1, 10]
+    assert table.period_start(10) == date(2023, 9, 18)
+    assert table.periods_in_range(date(2023, 9, 18), 9) == 3
+
+
+def test_is_valid_periodicity():
+    """
+    Test validating periodicities.
+    """
+    assert is_valid_periodicity('weekly')
+    assert is_valid_periodicity('calendar monthly')
+    assert is_valid_periodicity('every 10 days')
+    assert not is_valid_periodicity('every 0 days')
+    assert not is_valid_periodicity('yearly')
+
+
+@freeze_time(date(2023, 10, 5))
+def test_complete_calendar_monthly():
+    """
+    Test completing a calendar monthly habit and counting days left.
+    """
+    habit = Habit.from_dictionary({"name": "budget", "periodicity": "calendar monthly", "progress": [],
+                                   "creation_date": {"y": 2023, "m": 8, "d": 19}})
+    habit.complete()
+    assert habit.progress == [2]
+    assert get_days_left(habit) == 27
+    assert get_broken_habits(habit, 40) == (0, 2)
+
+
+def test_tenant_manager_evicts_and_flushes(tmp_path):
+    """
+    Test loading users on demand and evicting the least recently used one.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    manager = TenantManager(tmp_path, memory_budget=1)
+    manager.get('alice').add_habit(Habit('reading', 'daily'))
+    manager.get('bob')
+    assert list(manager.tenants) == ['bob']
+    assert (tmp_path / 'alice.json').exists()
+    assert 'reading' in manager.get('alice').habits
+    assert manager.stats()['loads'] == 3
+    assert manager.stats()['evictions'] == 2
+
+
+def test_tenant_manager_stats(tmp_path):
+    """
+    Test per-user and aggregate statistics of the tenant manager.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    manager = TenantManager(tmp_path)
+    manager.get('alice').add_habit(Habit('reading', 'daily'))
+    manager.touch('alice')
+    manager.get('alice')
+    stats = manager.tenant_stats('alice')
+    assert stats['habits'] == 1
+    assert stats['hits'] == 1
+    assert stats['size'] == manager.stats()['memory']
+    with pytest.raises(ValueError):
+        manager.get('../alice')
+
+
+class SlowHabit(Habit):
+    def complete(self):
+        """
+        Mark the habit as completed, sleeping between the check and the append to widen the race window.
+        """
+        current_period = self.period_table.period_index(date.today())
+        if current_period in self.progress:
+            raise RuntimeError('habit already completed.')
+        time.sleep(0.001)
+        self.progress.append(current_period)
+
+
+class SlowDict(dict):
+    def get(self, key, default=None):
+        """
+        Look up a key, sleeping afterwards to widen the race window of check-then-insert callers.
+        """
+        value = super().get(key, default)
+        time.sleep(0.001)
+        return value
+
+
+def run_concurrently(workers, func):
+    """
+    Run a function from several threads started at the same time and count the calls that succeeded.
+
+    Args:
+        workers (int): The number of threads.
+        func: The function to call, raising RuntimeError on failure.
+
+    Returns:
+        int: The number of calls that did not raise RuntimeError.
+    """
+    barrier = threading.Barrier(workers)
+
+    def work(_):
+        barrier.wait()
+        try:
+            func()
+            return 1
+        except RuntimeError:
+            return 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(executor.map(work, range(workers)))
+
+
+@freeze_time(CURRENT_DAY)
+@pytest.mark.parametrize('thread_safe', [True, False])
+def test_thread_safe_database_stress(thread_safe):
+    """
+    Test that concurrent adds and completions of one habit succeed exactly once in thread safe
+    mode, and race without it.
+
+    Args:
+        thread_safe (bool): Whether the database is thread safe.
+    """
+    workers = 8
+    database = Database(thread_safe=thread_safe)
+    database.habits = SlowDict()
+    added = run_concurrently(workers, lambda: database.add_habit(SlowHabit('walk', 'daily')))
+    completed = run_concurrently(workers, lambda: database.complete_habit('walk'))
+    progress = database.snapshot()['walk'].progress
+    if thread_safe:
+        assert added == 1
+        assert completed == 1
+        assert progress == [0]
+    else:
+        assert added > 1
+        assert completed > 1
+        assert len(progress) > 1
+
+
+@freeze_time(CURRENT_DAY)
+def test_thread_safe_database_direct_habits(tmp_path):
+    """
+    Test that habits put into the habits dictionary directly can be saved, completed and deleted.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    database = Database(thread_safe=True)
+    database.habits['walk'] = Habit('walk', 'daily')
+    database.save_habits(tmp_path / 'direct.json')
+    database.complete_habit('walk')
+    assert database.snapshot()['walk'].progress == [0]
+    database.habits['run'] = Habit('run', 'daily')
+    database.delete_habit('run')
+    assert 'run' not in database.habits
+
+
+def test_tenant_manager_tracks_changes(tmp_path):
+    """
+    Test that the memory estimate follows changes and that unchanged users are not saved.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    manager = TenantManager(tmp_path)
+    database = manager.get('alice')
+    for i in range(100):
+        database.add_habit(Habit(f'habit_{i}', 'daily'))
+    assert manager.stats()['memory'] == estimate_size(database)
+    manager.get('ghost')
+    manager.unload('ghost')
+    assert not (tmp_path / 'ghost.json').exists()
+    manager.unload('alice')
+    assert (tmp_path / 'alice.json').exists()
+    assert manager.stats()['memory'] == 0
+
+
+def test_tenant_manager_pinned(tmp_path):
+    """
+    Test that pinned users are not evicted and are thread safe databases.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    manager = TenantManager(tmp_path, memory_budget=1)
+    with manager.pinned('alice') as database:
+        manager.get('bob')
+        manager.get('carol')
+        assert 'alice' in manager.tenants
+        assert database.thread_safe
+        database.add_habit(Habit('reading', 'daily'))
+    manager.get('dave')
+    assert 'alice' not in manager.tenants
+    assert 'reading' in manager.get('alice').habits
+
+
+def test_tenant_manager_flush_keeps_later_changes_dirty(tmp_path, monkeypatch):
+    """
+    Test that a change made while a user is being saved is not marked as saved.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+        monkeypatch: Pytest fixture for patching attributes.
+    """
+    manager = TenantManager(tmp_path)
+    database = manager.get('alice')
+    database.add_habit(Habit('reading', 'daily'))
+    save_habits = database.save_habits
+
+    def save_then_change(path):
+        save_habits(path)
+        database.add_habit(Habit('walking', 'daily'))
+
+    monkeypatch.setattr(database, 'save_habits', save_then_change)
+    manager.flush('alice')
+    assert manager.is_dirty('alice')
+    monkeypatch.undo()
+    manager.unload('alice')
+    assert 'walking' in manager.get('alice').habits
+
+
+def test_tenant_manager_unload_pinned(tmp_path):
+    """
+    Test that pinned users cannot be unloaded.
+
+    Args:
+        tmp_path: Temporary directory for testing.
+    """
+    manager = TenantManager(tmp_path)
+    with manager.pinned('alice'):
+        with pytest.raises(RuntimeError):
+            manager.unload('alice')
+    manager.unload('alice')
+    assert 'alice' not in manager.tenants
+
+
+def test_estimate_size_concurrent_writes():
+    """
+    Test measuring a thread safe database while another thread adds habits to it.
+    """
+    database = Database(thread_safe=True)
+
+    def writer():
+        for i in range(2000):
+            database.add_habit(Habit(f'habit_{i}', 'daily'))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    while thread.is_alive():
+        estimate_size(database)
+    thread.join()
+    assert len(database.habits) == 2000
+
+
+def measure_completions(workers, global_lock):
+    """
+    Measure how many habits per second several threads complete, each thread on its own habits.
+
+    Args:
+        workers (int): The number of threads.
+        global_lock: A lock held around every completion, or None to rely on the per-habit locks.
+
+    Returns:
+        float: The number of completions per second.
+    """
+    database = Database(thread_safe=True)
+    names = [f'habit_{i}' for i in range(64)]
+    for name in names:
+        database.add_habit(SlowHabit(name, 'daily'))
+
+    def work(index):
+        for name in names[index::workers]:
+            if global_lock is None:
+                database.complete_habit(name)
+            else:
+                with global_lock:
+                    database.complete_habit(name)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(work, range(workers)))
+    elapsed = time.perf_counter() - start
+    assert all(habit.progress for habit in database.snapshot().values())
+    return len(names) / elapsed
+
+
+def test_thread_safe_database_throughput(record_property):
+    """
+    Test that completions of different habits scale across threads with per-habit locks,
+    compared to a single global lock, and report the throughput of both.
+
+    Args:
+        record_property: Pytest fixture for reporting values with the test result.
+    """
+    global_lock = threading.Lock()
+    per_habit = {}
+    single_lock = {}
+    for workers in (1, 2, 4, 8):
+        per_habit[workers] = measure_completions(workers, None)
+        single_lock[workers] = measure_completions(workers, global_lock)
+        record_property(f'per_habit_{workers}_threads', round(per_habit[workers]))
+        record_property(f'global_lock_{workers}_threads', round(single_lock[workers]))
+    assert per_habit[8] > 2 * per_habit[1]
+    assert per_habit[8] > 2 * single_lock[8]